@@ -1,25 +1,81 @@
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 from fpdf import FPDF
 from PIL import Image, ImageDraw, ImageFont
-import requests
-from io import BytesIO
+import aiohttp
+import asyncio
 import os
 import re
 from urllib.parse import quote
-import random
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+import hashlib
+import math
+import sqlite3
+import time
 
 # Directory to save book covers
 cover_dir = 'book_covers'
 not_found_report = 'missing_books_report.txt'
 
-# Ensure directories exist
-if not os.path.exists(cover_dir):
-    os.makedirs(cover_dir)
+# SQLite cache of resolved cover URLs and known misses
+cache_db = 'cache.db'
 
-# List to store information about missing covers
-missing_books = []
+# Books with no cover are looked up again once their cache entry is this old (30 days)
+MISSING_CACHE_TTL = 30 * 24 * 60 * 60
+
+# Maximum number of cover lookups (and HTTP connections) in flight at once
+MAX_CONCURRENT_REQUESTS = 32
+
+# Downloads are streamed to disk in chunks of this many bytes
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# Covers are drawn 30x45 mm on the cards, so store them no larger than this (generic covers are flat color and text)
+COVER_SIZE = (400, 600)
+GENERIC_COVER_SIZE = (200, 300)
+
+# JPEG settings used whenever a cover is (re-)encoded
+COVER_JPEG_OPTIONS = {'quality': 82, 'optimize': True, 'progressive': True}
+
+# Write buffer size (and slice size) used when saving the finished PDF
+OUTPUT_BUFFER_SIZE = 1 << 20
+
+# Number of ISBNs combined into one Google Books query
+GOOGLE_BOOKS_BATCH_SIZE = 10
+
+# Connect/read timeouts so a stalled API call cannot hang the run
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(sock_connect=3.05, sock_read=10)
+
+# Retry transient failures (rate limiting, server errors, dropped connections) with exponential backoff
+RETRY_TOTAL = 3
+RETRY_BACKOFF = 0.3
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Longest Retry-After (in seconds) honoured before retrying a rate-limited request
+RETRY_AFTER_MAX = 60
+
+# Precompiled patterns for cleaning ISBNs (quotes and equal signs) and titles (anything in parentheses)
+_ISBN_RE = re.compile(r'[="]')
+_PARENS_RE = re.compile(r'\(.*?\)')
+
+# List of bright colors for the generic cover backgrounds
+BRIGHT_COLORS = [
+    (255, 99, 71),   # Tomato Red
+    (135, 206, 250), # Sky Blue
+    (255, 165, 0),   # Orange
+    (124, 252, 0),   # Lawn Green
+    (255, 105, 180), # Hot Pink
+    (32, 178, 170),  # Light Sea Green
+    (147, 112, 219), # Medium Purple
+    (255, 223, 0)    # Gold
+]
+
+# Large fonts available on Fedora for the generic covers, tried in order
+FONT_PATHS = [
+    "/usr/share/fonts/google-droid-sans-fonts/DroidSans-Bold.ttf",  # Droid Sans Bold
+    "/usr/share/fonts/open-sans/OpenSans-Bold.ttf",                 # Open Sans Bold
+    "/usr/share/fonts/liberation-sans/LiberationSans-Bold.ttf",     # Liberation Sans Bold
+]
 
 # Function to clean the ISBN (remove extra characters like quotes and equal signs)
 def clean_isbn(isbn):
@@ -27,20 +83,59 @@ def clean_isbn(isbn):
     if pd.isna(isbn):
         return None
     # Remove leading/trailing quotes and equal signs
-    clean_isbn = re.sub(r'[="]', '', str(isbn).strip())
+    clean_isbn = _ISBN_RE.sub('', str(isbn).strip())
     return clean_isbn if clean_isbn else None
 
 # Function to clean the title by removing anything in parentheses
 def clean_title(title):
     """Remove anything inside parentheses from the title."""
-    return re.sub(r'\(.*?\)', '', title).strip()
+    return _PARENS_RE.sub('', title).strip()
 
-# Function to check if the file exists and is valid (greater than 0 bytes and not 631 bytes)
+# Function to check if a cover file size is valid (greater than 0 bytes and not 631 bytes)
+def is_valid_size(size):
+    return size > 0 and size != 631
+
+# Function to check if the file exists and is valid (a single stat call)
 def is_valid_file(path):
-    return os.path.exists(path) and os.path.getsize(path) > 0 and os.path.getsize(path) != 631
+    try:
+        return is_valid_size(os.stat(path).st_size)
+    except FileNotFoundError:
+        return False
+
+# Function to list the cover directory once instead of checking every expected cover file separately
+def scan_cover_dir():
+    """Return {file name: size in bytes} for the files in cover_dir."""
+    with os.scandir(cover_dir) as entries:
+        return {entry.name: entry.stat().st_size for entry in entries if entry.is_file()}
+
+# Function to issue a GET request, retrying transient failures
+async def get_with_retry(session, url, **kwargs):
+    """GET url on the shared session, retrying up to RETRY_TOTAL times on 429/5xx responses and connection errors.
+
+    Raises aiohttp.ClientResponseError for any error status other than 404, including a 429/5xx that outlasts
+    the retries, so callers can tell a failed lookup from a definitive "not found".
+    """
+    for attempt in range(RETRY_TOTAL + 1):
+        delay = RETRY_BACKOFF * (2 ** attempt)
+        try:
+            response = await session.get(url, **kwargs)
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            if attempt == RETRY_TOTAL:
+                raise
+        else:
+            if response.status not in RETRY_STATUSES or attempt == RETRY_TOTAL:
+                if response.status != 404:
+                    response.raise_for_status()
+                return response
+            # Wait as long as the server asks (in seconds) when it is rate limiting us
+            retry_after = response.headers.get('Retry-After', '')
+            if retry_after.isdigit():
+                delay = max(delay, min(int(retry_after), RETRY_AFTER_MAX))
+            response.release()
+        await asyncio.sleep(delay)
 
 # Function to search Open Library for an ISBN using title and author
-def get_isbn_from_open_library(title, author):
+async def get_isbn_from_open_library(session, title, author):
     """Search Open Library by title and author and return the ISBN if available."""
     base_url = "https://openlibrary.org/search.json"
     params = {
@@ -48,41 +143,55 @@ def get_isbn_from_open_library(title, author):
         'author': author
     }
     
-    try:
-        response = requests.get(base_url, params=params)
-        if response.status_code == 200:
-            data = response.json()
+    async with await get_with_retry(session, base_url, params=params) as response:
+        if response.status == 200:
+            data = await response.json(content_type=None)
             if 'docs' in data and len(data['docs']) > 0:
                 # Return the first ISBN found in the search results
                 for doc in data['docs']:
                     if 'isbn' in doc:
                         return doc['isbn'][0]  # Return the first ISBN in the list
-        return None
-    except Exception as e:
-        print(f"Error fetching ISBN from Open Library: {e}")
-        return None
-
+    return None
+
+# Function to load the generic cover fonts once per process
+@lru_cache(maxsize=None)
+def load_cover_fonts():
+    """Find a large font available on Fedora and return (title_font, small_font), falling back to the default font."""
+    # Use the first valid font path
+    for path in FONT_PATHS:
+        if os.path.exists(path):
+            return ImageFont.truetype(path, 20), ImageFont.truetype(path, 15)  # Large font sizes for a 200x300 cover
+
+    print("Font not found, using default.")
+    return ImageFont.load_default(), ImageFont.load_default()
+
+# Function to measure rendered text width (author names and years repeat across many covers)
+@lru_cache(maxsize=4096)
+def text_width(font, text):
+    """Return the pixel width of text drawn with font."""
+    bbox = font.getbbox(text)
+    return bbox[2] - bbox[0]
+
+# Function to build a blank cover in a given color, copied for each generic cover
+@lru_cache(maxsize=None)
+def blank_cover(bg_color):
+    """Return a GENERIC_COVER_SIZE image filled with bg_color. Callers must copy it before drawing."""
+    return Image.new('RGB', GENERIC_COVER_SIZE, color=bg_color)
+
+# Function to derive a stable key from the text drawn on a generic cover
+def generic_cover_key(title, author, pub_date):
+    """Return a 16-character hex digest of (title, author, pub_date), used for the file name and color."""
+    text = f"{title}\0{author}\0{pub_date}".encode('utf-8')
+    return hashlib.blake2b(text, digest_size=8).hexdigest()
 
 def generate_generic_cover(title, author, pub_date, cover_path):
     """Generate a generic book cover with a colorful background and large, bright fonts (Fedora-compatible)."""
     
-    # List of bright colors for the background
-    bright_colors = [
-        (255, 99, 71),   # Tomato Red
-        (135, 206, 250), # Sky Blue
-        (255, 165, 0),   # Orange
-        (124, 252, 0),   # Lawn Green
-        (255, 105, 180), # Hot Pink
-        (32, 178, 170),  # Light Sea Green
-        (147, 112, 219), # Medium Purple
-        (255, 223, 0)    # Gold
-    ]
-    
-    # Pick a random color for the background
-    bg_color = random.choice(bright_colors)
+    # Pick the background color from the cover key, so the same book always gets the same cover
+    bg_color = BRIGHT_COLORS[int(generic_cover_key(title, author, pub_date), 16) % len(BRIGHT_COLORS)]
     
-    # Create the image with the random bright background color
-    img = Image.new('RGB', (400, 600), color=bg_color)
+    # Start from a copy of the blank cover in the bright background color
+    img = blank_cover(bg_color).copy()
     draw = ImageDraw.Draw(img)
     
     # Set the text content (Title, Author, and Publication Date)
@@ -90,196 +199,389 @@ def generate_generic_cover(title, author, pub_date, cover_path):
     author_text = f"By: {author}"
     pub_date_text = f"Published: {pub_date}"
 
-    # Try to use a large font available on Fedora, fallback to default if unavailable
-    font_path = None
-    possible_paths = [
-        "/usr/share/fonts/google-droid-sans-fonts/DroidSans-Bold.ttf",  # Droid Sans Bold
-        "/usr/share/fonts/open-sans/OpenSans-Bold.ttf",                 # Open Sans Bold
-        "/usr/share/fonts/liberation-sans/LiberationSans-Bold.ttf",     # Liberation Sans Bold
-    ]
-
-    # Find the first valid font path
-    for path in possible_paths:
-        if os.path.exists(path):
-            font_path = path
-            break
-
-    if font_path:
-        font = ImageFont.truetype(font_path, 40)  # Large font size
-        font_small = ImageFont.truetype(font_path, 30)
-    else:
-        print("Font not found, using default.")
-        font = ImageFont.load_default()
-        font_small = ImageFont.load_default()
+    font, font_small = load_cover_fonts()
     
     # Use a bright color for the text (white or black)
     text_color = (255, 255, 255) if bg_color != (255, 223, 0) else (0, 0, 0)  # White text, black if background is gold
     
-    # Calculate text bounding box to center it
-    title_bbox = draw.textbbox((0, 0), title_text, font=font)
-    author_bbox = draw.textbbox((0, 0), author_text, font=font_small)
-    pub_date_bbox = draw.textbbox((0, 0), pub_date_text, font=font_small)
-
-    title_width = title_bbox[2] - title_bbox[0]
-    author_width = author_bbox[2] - author_bbox[0]
-    pub_date_width = pub_date_bbox[2] - pub_date_bbox[0]
+    # Calculate text widths to center it
+    title_width = text_width(font, title_text)
+    author_width = text_width(font_small, author_text)
+    pub_date_width = text_width(font_small, pub_date_text)
 
     # Centering title, author, and publication date on the image
-    draw.text(((400 - title_width) // 2, 150), title_text, fill=text_color, font=font)
-    draw.text(((400 - author_width) // 2, 300), author_text, fill=text_color, font=font_small)
-    draw.text(((400 - pub_date_width) // 2, 400), pub_date_text, fill=text_color, font=font_small)
+    width, height = GENERIC_COVER_SIZE
+    draw.text(((width - title_width) // 2, height // 4), title_text, fill=text_color, font=font)
+    draw.text(((width - author_width) // 2, height // 2), author_text, fill=text_color, font=font_small)
+    draw.text(((width - pub_date_width) // 2, height * 2 // 3), pub_date_text, fill=text_color, font=font_small)
 
     # Save the generic cover
-    img.save(cover_path)
+    img.save(cover_path, 'JPEG', **COVER_JPEG_OPTIONS)
+
+# Function to render one generic cover in a worker process
+def _gen_cover_worker(job):
+    """Unpack a (title, author, pub_date, cover_path) job and render it."""
+    generate_generic_cover(*job)
+
+# Function to render all pending generic covers in parallel
+def generate_generic_covers(jobs):
+    """Render the generic covers across CPU cores; JPEG encoding is CPU bound and each cover is independent."""
+    # Books with the same title, author and date share one file: render it once, and only if it is not on disk yet
+    pending = {job[3]: job for job in jobs if not is_valid_file(job[3])}
+    if not pending:
+        return
+    with ProcessPoolExecutor() as executor:
+        list(executor.map(_gen_cover_worker, pending.values(), chunksize=16))
+
+# Function to shrink a downloaded cover to display size and make sure it is an RGB JPEG
+def prepare_cover(cover_path):
+    """Re-encode the cover in place if it is not a JPEG or is larger than COVER_SIZE (runs off the event loop).
+
+    Returns False for a 1x1 placeholder image.
+    """
+    with Image.open(cover_path) as img:
+        if img.size == (1, 1):
+            return False
+        # Covers that are already small JPEGs are kept byte for byte
+        if img.format == 'JPEG' and img.width <= COVER_SIZE[0] and img.height <= COVER_SIZE[1]:
+            return True
+        img.thumbnail(COVER_SIZE, Image.LANCZOS)
+        img = img.convert('RGB')
+    img.save(cover_path, 'JPEG', **COVER_JPEG_OPTIONS)
+    return True
+
+# Function to download an image URL to the cover path
+async def save_cover_from_url(session, url, cover_path):
+    """Stream the image at url into cover_path and return True if the saved file is valid."""
+    try:
+        async with await get_with_retry(session, url) as response:
+            if response.status != 200:
+                return False
+            # Write the body straight to disk instead of holding the whole image in memory
+            with open(cover_path, 'wb') as f:
+                async for chunk in response.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                    f.write(chunk)
+
+        is_cover = await asyncio.to_thread(prepare_cover, cover_path)
+    except Exception:
+        # Never leave a partial download behind, it would look like a valid cover on the next run
+        if os.path.exists(cover_path):
+            os.remove(cover_path)
+        raise
+
+    # Check if the file is valid (handle placeholder images and 631-byte failed files)
+    if is_cover and is_valid_file(cover_path):
+        return True
+    print(f"Cover download from {url} returned a placeholder image. Deleting.")
+    os.remove(cover_path)
+    return False
 
 # Function to attempt downloading a cover from Open Library
-def fetch_from_open_library(isbn, cover_path):
-    """Try to get the cover from Open Library using the ISBN."""
+async def fetch_from_open_library(session, isbn, cover_path):
+    """Try to get the cover from Open Library using the ISBN and return its URL on success."""
     if not isbn:
-        return False
+        return None
     
-    try:
-        open_library_url = f"https://covers.openlibrary.org/b/isbn/{isbn}-L.jpg"
-        print(f"Trying Open Library: {open_library_url}")
-        response = requests.get(open_library_url)
-        
-        if response.status_code == 200:
-            img = Image.open(BytesIO(response.content))
-            if img.mode != 'RGB':
-                img = img.convert('RGB')
-            img.save(cover_path, 'JPEG')
-            
-            # Check if the file is valid
-            if is_valid_file(cover_path):
-                return True
-            else:
-                print(f"Open Library cover download failed (631 bytes) for ISBN {isbn}. Deleting.")
-                os.remove(cover_path)
-                return False
-        else:
-            print(f"Open Library did not return a valid cover for ISBN {isbn}.")
-            return False
-    except Exception as e:
-        print(f"Error fetching cover from Open Library: {e}")
-        return False
+    # default=false makes Open Library answer 404 instead of sending a placeholder image body
+    open_library_url = f"https://covers.openlibrary.org/b/isbn/{isbn}-L.jpg?default=false"
+    print(f"Trying Open Library: {open_library_url}")
+    if await save_cover_from_url(session, open_library_url, cover_path):
+        return open_library_url
+    print(f"Open Library did not return a valid cover for ISBN {isbn}.")
+    return None
+
+# Function to attempt downloading a cover from a Google Books search
+async def fetch_from_google_books(session, google_books_url, cover_path):
+    """Run a Google Books volume search, download the first result's cover and return its URL on success."""
+    async with await get_with_retry(session, google_books_url) as response:
+        if response.status != 200:
+            return None
+        book_data = await response.json(content_type=None)
+
+    # Check if 'items' exists in the response before accessing it
+    if 'items' not in book_data or len(book_data['items']) == 0:
+        print(f"No items found in Google Books for {google_books_url}.")
+        return None
+
+    # If only one result is returned, accept it immediately
+    volume_info = book_data['items'][0].get('volumeInfo')
+    if not volume_info:
+        return None
+
+    image_links = volume_info.get('imageLinks', {})
+    cover_url = image_links.get('large') or image_links.get('extraLarge') or image_links.get('thumbnail')
+    if cover_url and await save_cover_from_url(session, cover_url, cover_path):
+        return cover_url
+    return None
+
+# Function to look up the cover URL and ISBN remembered from a previous run
+def get_cached_cover(cache, book_id, isbn):
+    """Return the cached (isbn, cover_url, status) for a book, or None if there is no usable entry."""
+    entry = cache.execute(
+        "SELECT isbn, cover_url, status, ts FROM covers WHERE book_id = ?", (book_id,)
+    ).fetchone()
+    if entry is None:
+        return None
+
+    cached_isbn, cover_url, status, ts = entry
+    # A different ISBN in the export means the cached lookup was for another edition
+    if isbn and cached_isbn and isbn != cached_isbn:
+        return None
+    # Retry books that were missing a long time ago, a cover may have been added since
+    if status == 'missing' and time.time() - ts > MISSING_CACHE_TTL:
+        return None
+    return cached_isbn, cover_url, status
+
+# Function to remember the outcome of a cover lookup
+def set_cached_cover(cache, book_id, isbn, cover_url, status):
+    """Store a resolved cover URL ('found') or a definitive miss ('missing') for a book."""
+    with cache:
+        cache.execute(
+            "INSERT OR REPLACE INTO covers (book_id, isbn, cover_url, status, ts) VALUES (?, ?, ?, ?, ?)",
+            (book_id, isbn, cover_url, status, int(time.time()))
+        )
+
+# Function to open (and create if needed) the cover lookup cache
+def open_cover_cache(path=cache_db):
+    """Open the SQLite cover cache with WAL journaling and a larger page cache."""
+    cache = sqlite3.connect(path)
+    cache.execute("PRAGMA journal_mode=WAL")
+    cache.execute("PRAGMA synchronous=NORMAL")
+    cache.execute("PRAGMA cache_size=-16000")  # ~16 MB page cache
+    cache.execute(
+        "CREATE TABLE IF NOT EXISTS covers ("
+        "book_id INTEGER PRIMARY KEY, isbn TEXT, cover_url TEXT, status TEXT, ts INTEGER)"
+    )
+    return cache
 
 # Function to download cover using Google Books API
-def download_cover(row):
-    """Download book cover using ISBN first, and fallback to Title/Author. Also use Open Library if Google Books fails."""
-    book_id = row['Book Id']
+async def download_cover(session, cache, google_cover_urls, missing_books, generic_cover_jobs, row):
+    """Download book cover using ISBN first, and fallback to Title/Author. Also use Open Library if Google Books fails.
+
+    google_cover_urls holds the batched Google Books results keyed by ISBN. Books without a cover are
+    added to missing_books as (title, book_id, isbn), and their generic cover to generic_cover_jobs.
+    """
+    book_id = int(row['Book Id'])
     title = clean_title(row['Title'])
     author = row['Author']
-    isbn = clean_isbn(row['ISBN13'])
-    published_year = row['Year Published']
-    date =     row['Year Published']
+    isbn = row['ISBN_clean']
+    date = row['Year Published']
     # URL encode the title and author to avoid issues with special characters
     encoded_title = quote(title)
     encoded_author = quote(author)
 
-    # Set cover path using the book's ID
+    # Set cover path using the book's ID (fetch_covers has already skipped books with a valid cover on disk)
     cover_path = f"{cover_dir}/cover_{book_id}.jpg"
-    
-    # Check if cover already exists and is a valid file (also handle 631-byte failed files)
-    if is_valid_file(cover_path):
-        print(f"Cover for Book ID {book_id} already exists and is valid. Skipping download.")
-        return cover_path
 
-    # If no ISBN is available, attempt to get it from Open Library
-    if not isbn:
-        print(f"No ISBN found for {title}. Searching Open Library for an ISBN.")
-        isbn = get_isbn_from_open_library(title, author)
-        if isbn:
-            print(f"Found ISBN {isbn} for {title}.")
+    # Reuse the lookup from a previous run when there is one
+    cached = get_cached_cover(cache, book_id, isbn)
+    lookup_failed = False
+    if cached:
+        cached_isbn, cover_url, status = cached
+        isbn = isbn or cached_isbn
+        if status == 'found':
+            print(f"Using cached cover URL for {title}: {cover_url}")
+            try:
+                if await save_cover_from_url(session, cover_url, cover_path):
+                    return cover_path
+            except Exception as e:
+                print(f"Error downloading cached cover for {title}: {e}")
+            # The cached URL no longer works, fall through to a full lookup
+            cached = None
         else:
-            print(f"Could not find an ISBN for {title}.")
-    
-    try:
+            print(f"Cover for {title} (Book ID {book_id}) was not found on a recent run. Skipping lookup.")
+
+    if not cached:
+        # Each source is tried on its own: a network or HTTP error in one moves on to the next source,
+        # but it is not a definitive miss, so the book is then not cached as missing
+        cover_url = None
+
+        # If no ISBN is available, attempt to get it from Open Library
+        if not isbn:
+            print(f"No ISBN found for {title}. Searching Open Library for an ISBN.")
+            try:
+                isbn = await get_isbn_from_open_library(session, title, author)
+            except Exception as e:
+                print(f"Error fetching ISBN from Open Library: {e}")
+                lookup_failed = True
+            if isbn:
+                print(f"Found ISBN {isbn} for {title}.")
+            else:
+                print(f"Could not find an ISBN for {title}.")
+
         # Step 1: Try using the ISBN if available (Google Books)
-        if isbn:
-            google_books_url = f"https://www.googleapis.com/books/v1/volumes?q=isbn:{quote(isbn)}"
-            print(f"Trying ISBN search with Google Books: {google_books_url}")
-            response = requests.get(google_books_url)
-            if response.status_code == 200:
-                book_data = response.json()
-                
-                # Check if 'items' exists in the response before accessing it
-                if 'items' in book_data and len(book_data['items']) > 0:
-                    # If only one result is returned, accept it immediately
-                    volume_info = book_data['items'][0]['volumeInfo']
-                    
-                    if volume_info:
-                        image_links = volume_info.get('imageLinks', {})
-                        cover_url = image_links.get('large') or image_links.get('extraLarge') or image_links.get('thumbnail')
-                        if cover_url:
-                            # Fetch and save the cover image
-                            response = requests.get(cover_url)
-                            if response.status_code == 200:
-                                img = Image.open(BytesIO(response.content))
-                                if img.mode != 'RGB':
-                                    img = img.convert('RGB')
-                                img.save(cover_path, 'JPEG')
-                                
-                                # Check if the file is valid (handle 631-byte failed files)
-                                if is_valid_file(cover_path):
-                                    print(f"Downloaded cover for {title} via Google Books (Book ID {book_id}).")
-                                    return cover_path
-                                else:
-                                    print(f"Google Books cover download failed (631 bytes) for {title}. Deleting.")
-                                    os.remove(cover_path)
-                else:
-                    print(f"No items found for ISBN {isbn} in Google Books.")
+        try:
+            if isbn and isbn in google_cover_urls:
+                # Already resolved by the batched ISBN lookup
+                google_cover_url = google_cover_urls[isbn]
+                if await save_cover_from_url(session, google_cover_url, cover_path):
+                    cover_url = google_cover_url
+                    print(f"Downloaded cover for {title} via Google Books (Book ID {book_id}).")
+            elif isbn:
+                google_books_url = f"https://www.googleapis.com/books/v1/volumes?q=isbn:{quote(isbn)}"
+                print(f"Trying ISBN search with Google Books: {google_books_url}")
+                cover_url = await fetch_from_google_books(session, google_books_url, cover_path)
+                if cover_url:
+                    print(f"Downloaded cover for {title} via Google Books (Book ID {book_id}).")
+        except Exception as e:
+            print(f"Error downloading cover for {title} from Google Books: {e}")
+            lookup_failed = True
 
         # Step 2: Fallback to Open Library if Google Books fails
-        if isbn:
-            if fetch_from_open_library(isbn, cover_path):
-                print(f"Downloaded cover from Open Library for {title} (Book ID {book_id}).")
-                return cover_path
+        if isbn and not cover_url:
+            try:
+                cover_url = await fetch_from_open_library(session, isbn, cover_path)
+                if cover_url:
+                    print(f"Downloaded cover from Open Library for {title} (Book ID {book_id}).")
+            except Exception as e:
+                print(f"Error fetching cover from Open Library: {e}")
+                lookup_failed = True
 
         # Step 3: Try Google Books with Title/Author as a fallback if both ISBN methods fail
-        google_books_url = f"https://www.googleapis.com/books/v1/volumes?q=intitle:{encoded_title}+inauthor:{encoded_author}"
-        print(f"Trying Title/Author search with Google Books: {google_books_url}")
-        response = requests.get(google_books_url)
-        if response.status_code == 200:
-            book_data = response.json()
-            
-            # Check if 'items' exists in the response before accessing it
-            if 'items' in book_data and len(book_data['items']) > 0:
-                # If only one result is returned, accept it immediately
-                volume_info = book_data['items'][0]['volumeInfo']
-                
-                if volume_info:
-                    image_links = volume_info.get('imageLinks', {})
-                    cover_url = image_links.get('large') or image_links.get('extraLarge') or image_links.get('thumbnail')
-                    if cover_url:
-                        # Fetch and save the cover image
-                        response = requests.get(cover_url)
-                        if response.status_code == 200:
-                            img = Image.open(BytesIO(response.content))
-                            if img.mode != 'RGB':
-                                img = img.convert('RGB')
-                            img.save(cover_path, 'JPEG')
-                            
-                            # Check if the file is valid (handle 631-byte failed files)
-                            if is_valid_file(cover_path):
-                                print(f"Downloaded cover for {title} via Title/Author (Book ID {book_id}).")
-                                return cover_path
-                            else:
-                                print(f"Google Books cover download failed (631 bytes) for {title}. Deleting.")
-                                os.remove(cover_path)
-            else:
-                print(f"No items found for Title/Author search for {title} in Google Books.")
-    except Exception as e:
-        print(f"Error downloading cover for {title}: {e}")
+        if not cover_url:
+            google_books_url = f"https://www.googleapis.com/books/v1/volumes?q=intitle:{encoded_title}+inauthor:{encoded_author}"
+            print(f"Trying Title/Author search with Google Books: {google_books_url}")
+            try:
+                cover_url = await fetch_from_google_books(session, google_books_url, cover_path)
+                if cover_url:
+                    print(f"Downloaded cover for {title} via Title/Author (Book ID {book_id}).")
+            except Exception as e:
+                print(f"Error downloading cover for {title} via Title/Author: {e}")
+                lookup_failed = True
+
+        if cover_url:
+            set_cached_cover(cache, book_id, isbn, cover_url, 'found')
+            return cover_path
+        if not lookup_failed:
+            set_cached_cover(cache, book_id, isbn, None, 'missing')
 
     # If no cover was found, generate a generic cover and add to missing list
-    generic_cover_path = f"{cover_dir}/GENERIC_{book_id}.jpg"
+    generic_cover_path = f"{cover_dir}/GENERIC_{generic_cover_key(title, author, date)}.jpg"
     print(f"No cover found for {title} (Book ID {book_id}). Generating a generic cover.")
 
-    generate_generic_cover(title, author, date, generic_cover_path)
+    generic_cover_jobs.append((title, author, date, generic_cover_path))
     missing_books.append((title, book_id, isbn))
     
     return generic_cover_path
 
+# Function to check whether a book still needs its cover looked up online
+def needs_lookup(cache, row):
+    """Return True if the book (which has no valid cover on disk) has no usable cache entry."""
+    return get_cached_cover(cache, int(row['Book Id']), row['ISBN_clean']) is None
+
+# Function to resolve a batch of ISBNs with a single Google Books query
+async def fetch_google_cover_urls(session, semaphore, isbns):
+    """Look up several ISBNs with one OR query and return {isbn: cover_url} for the ISBNs it matched.
+
+    ISBNs that are not matched (or all of them, if the request fails) are left out, so they get their own query later.
+    """
+    query = '+OR+'.join(f"isbn:{quote(isbn)}" for isbn in isbns)
+    google_books_url = (
+        f"https://www.googleapis.com/books/v1/volumes?q={query}&maxResults=40"
+        "&fields=items(volumeInfo/industryIdentifiers,volumeInfo/imageLinks)"
+    )
+    print(f"Trying batched ISBN search with Google Books: {google_books_url}")
+
+    try:
+        async with semaphore:
+            async with await get_with_retry(session, google_books_url) as response:
+                if response.status != 200:
+                    return {}
+                book_data = await response.json(content_type=None)
+    except Exception as e:
+        print(f"Error fetching batched ISBN search from Google Books: {e}")
+        return {}
+
+    # Match the returned volumes back to the requested ISBNs
+    wanted = set(isbns)
+    cover_urls = {}
+    for item in book_data.get('items', []):
+        volume_info = item.get('volumeInfo', {})
+        image_links = volume_info.get('imageLinks', {})
+        cover_url = image_links.get('large') or image_links.get('extraLarge') or image_links.get('thumbnail')
+        if not cover_url:
+            continue
+        for identifier in volume_info.get('industryIdentifiers', []):
+            isbn = identifier.get('identifier')
+            if isbn in wanted and isbn not in cover_urls:
+                cover_urls[isbn] = cover_url
+    return cover_urls
+
+# Function to resolve a single book's cover while holding a concurrency slot
+async def fetch_one(session, semaphore, cache, google_cover_urls, missing_books, generic_cover_jobs, row):
+    """Download one book's cover and return a (book_id, cover_path) pair."""
+    async with semaphore:
+        cover_path = await download_cover(session, cache, google_cover_urls, missing_books, generic_cover_jobs, row)
+        return row['Book Id'], cover_path
+
+# Function to resolve every cover concurrently over a shared HTTP session
+async def fetch_all_covers(rows, cache, missing_books, generic_cover_jobs):
+    """Fetch covers for all rows with at most MAX_CONCURRENT_REQUESTS lookups in flight."""
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    # One pooled session for every lookup so keep-alive connections amortize the TLS handshakes
+    connector = aiohttp.TCPConnector(limit=MAX_CONCURRENT_REQUESTS, ttl_dns_cache=300)
+    async with aiohttp.ClientSession(connector=connector, timeout=REQUEST_TIMEOUT) as session:
+        # Resolve the known ISBNs in batches first so most books skip their own Google Books query
+        isbns = sorted({row['ISBN_clean'] for row in rows if needs_lookup(cache, row)} - {None})
+        batches = [isbns[i:i + GOOGLE_BOOKS_BATCH_SIZE] for i in range(0, len(isbns), GOOGLE_BOOKS_BATCH_SIZE)]
+        google_cover_urls = {}
+        for batch_urls in await asyncio.gather(*[fetch_google_cover_urls(session, semaphore, batch) for batch in batches]):
+            google_cover_urls.update(batch_urls)
+
+        results = await asyncio.gather(*[
+            fetch_one(session, semaphore, cache, google_cover_urls, missing_books, generic_cover_jobs, row)
+            for row in rows
+        ])
+    return dict(results)
+
+# Function to fetch all covers up front so the PDF pass only reads local files
+def fetch_covers(df):
+    """Resolve every book's cover concurrently.
+
+    Returns a {book_id: cover_path} dict and the list of (title, book_id, isbn) for books without a cover.
+    """
+    # Books whose cover already exists and is a valid file (also handle 631-byte failed files) need no lookup
+    cover_file_sizes = scan_cover_dir()
+    cover_paths = {}
+    rows = []
+    for row in df.to_dict('records'):
+        book_id = row['Book Id']
+        cover_name = f"cover_{book_id}.jpg"
+        if is_valid_size(cover_file_sizes.get(cover_name, 0)):
+            print(f"Cover for Book ID {book_id} already exists and is valid. Skipping download.")
+            cover_paths[book_id] = f"{cover_dir}/{cover_name}"
+        else:
+            rows.append(row)
+
+    # Books without a cover, and the generic covers to render once all lookups are done
+    # as (title, author, pub_date, cover_path)
+    missing_books = []
+    generic_cover_jobs = []
+
+    cache = open_cover_cache()
+    try:
+        cover_paths.update(asyncio.run(fetch_all_covers(rows, cache, missing_books, generic_cover_jobs)))
+    finally:
+        cache.close()
+
+    generate_generic_covers(generic_cover_jobs)
+    return cover_paths, missing_books
+
+# Function to read every cover's pixel size once before laying out the cards
+def read_cover_sizes(cover_paths):
+    """Return {cover_path: (width, height)} for the covers that exist and can be read."""
+    cover_sizes = {}
+    for cover_path in set(cover_paths.values()):
+        if not cover_path or not os.path.exists(cover_path):
+            continue
+        try:
+            # Image.open only reads the header, the pixel data is not decoded
+            with Image.open(cover_path) as img:
+                cover_sizes[cover_path] = img.size
+        except Exception as e:
+            print(f"Error reading cover {cover_path}: {e}")
+    return cover_sizes
+
 # Function to generate report of missing covers
 def generate_missing_books_report(missing_books):
     with open(not_found_report, 'w') as f:
@@ -288,109 +590,63 @@ def generate_missing_books_report(missing_books):
             title, book_id, isbn = book
             f.write(f"Title: {title}, Book ID: {book_id}, ISBN: {isbn if isbn else 'N/A'}\n")
 
-# Function to style graphs (using IBM-like fonts and AWS styling)
-def style_graphs():
-    plt.style.use('ggplot')  # Using ggplot style for a clean, polished look
-    plt.rcParams.update({
-        'font.size': 12,
-        'axes.labelsize': 12,
-        'axes.titlesize': 14,
-        'xtick.labelsize': 10,
-        'ytick.labelsize': 10,
-        'font.family': 'DejaVu Sans',
-    })
-
-
-# Subclass FPDF to add headers, footers, and page borders
-class PDF(FPDF):
-    def header(self):
-        # Adjust the starting position to allow content overlap
-        self.set_y(10)
-        # Set font
-        self.set_font('Helvetica', 'B', 12)
-        # Title (we'll leave some space at the top for overlapping)
-        self.cell(0, 10, 'Goodreads Reading Report', ln=True, align='C')
-        self.ln(5)
-    def footer(self):
-        # Position at 1.5 cm from bottom
-        self.set_y(-15)
-        # Set font
-        self.set_font('Helvetica', 'I', 8)
-        # Page number
-        self.cell(0, 10, f'Page {self.page_no()}', align='C')
-    def add_page(self, *args, **kwargs):
-        super().add_page(*args, **kwargs)
-        # Add page border
-        self.set_draw_color(0, 0, 0)  # Border color (black)
-        self.rect(5, 5, self.w - 10, self.h - 10)  # Draw rectangle border
-
-# Function to style graphs using Seaborn
-def style_graphs():
-    sns.set_theme(style="whitegrid")
-    sns.set_palette("deep")
-    plt.rcParams.update({
-        'font.size': 10,
-        'axes.labelsize': 10,
-        'axes.titlesize': 12,
-        'xtick.labelsize': 8,
-        'ytick.labelsize': 8,
-        'font.family': 'sans-serif',
-        'font.sans-serif': ['Helvetica']
-    })
-
-# Load and preprocess data
-df = pd.read_csv('goodreads_library_export.csv')
-df['Date Read'] = pd.to_datetime(df['Date Read'], errors='coerce')
-df['Year Read'] = df['Date Read'].dt.year
-df = df.dropna(subset=['Year Read'])
-df['Number of Pages'] = df['Number of Pages'].fillna(0).astype(int)
-
-
-# Subclass FPDF to add headers, footers, and page borders
-class PDF(FPDF):
-    def header(self):
-        # Set font
-        self.set_font('Helvetica', 'B', 12)
-        # Title
-        self.cell(0, 10, 'Goodreads Reading Report', ln=True, align='C')
-        self.ln(5)
-    def footer(self):
-        # Position at 1.5 cm from bottom
-        self.set_y(-15)
-        # Set font
-        self.set_font('Helvetica', 'I', 8)
-        # Page number
-        self.cell(0, 10, f'Page {self.page_no()}', align='C')
-    def add_page(self, *args, **kwargs):
-        super().add_page(*args, **kwargs)
-        # Add page border
-        self.set_draw_color(0, 0, 0)  # Border color (black)
-        self.rect(5, 5, self.w - 10, self.h - 10)  # Draw rectangle border
-
-# Function to style graphs using Seaborn
-def style_graphs():
-    sns.set_theme(style="whitegrid")
-    sns.set_palette("deep")
-    plt.rcParams.update({
-        'font.size': 10,
-        'axes.labelsize': 10,
-        'axes.titlesize': 12,
-        'xtick.labelsize': 8,
-        'ytick.labelsize': 8,
-        'font.family': 'sans-serif',
-        'font.sans-serif': ['Helvetica']
-    })
-
-# Load and preprocess data
-df = pd.read_csv('goodreads_library_export.csv')
-df['Date Read'] = pd.to_datetime(df['Date Read'], errors='coerce')
-df['Year Read'] = df['Date Read'].dt.year
-df = df.dropna(subset=['Year Read'])
-df['Number of Pages'] = df['Number of Pages'].fillna(0).astype(int)
-
-
 # Subclass FPDF to add headers, footers, and page borders
 class PDF(FPDF):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # FPDF keeps the document in a str and appends with +=, which is quadratic in the
+        # document size once many cover images are embedded; a bytearray appends in place
+        self.buffer = bytearray()
+        # Image file name -> name of the first file with the same bytes, and content digest -> that name
+        self.image_aliases = {}
+        self.image_digests = {}
+    def _out(self, s):
+        # Page content is still collected as str (FPDF edits it when closing the document)
+        if self.state == 2:
+            if isinstance(s, bytes):
+                s = s.decode('latin1')
+            elif not isinstance(s, str):
+                s = str(s)
+            self.pages[self.page] += s + "\n"
+            return
+        if isinstance(s, str):
+            s = s.encode('latin1')
+        elif not isinstance(s, (bytes, bytearray)):
+            s = str(s).encode('latin1')
+        self.buffer += s
+        self.buffer += b"\n"
+    def output(self, name='', dest=''):
+        """Output PDF to some destination, with the same destinations and return values as FPDF.output."""
+        # Finish document if necessary
+        if self.state < 3:
+            self.close()
+        dest = dest.upper()
+        if dest == '':
+            if name == '':
+                name = 'doc.pdf'
+                dest = 'I'
+            else:
+                dest = 'F'
+        if dest == 'I' or dest == 'D':
+            print(self.buffer.decode('latin1'))
+        elif dest == 'F':
+            # Stream the buffer out in 1 MB slices of a memoryview, so no second copy of the document is made
+            view = memoryview(self.buffer)
+            with open(name, 'wb', buffering=OUTPUT_BUFFER_SIZE) as f:
+                for start in range(0, len(view), OUTPUT_BUFFER_SIZE):
+                    f.write(view[start:start + OUTPUT_BUFFER_SIZE])
+        elif dest == 'S':
+            return self.buffer.decode('latin1')
+        else:
+            self.error('Incorrect output destination: ' + dest)
+        return ''
+    def image(self, name, *args, **kwargs):
+        # Embed files with identical bytes (e.g. shared generic covers) as a single image object
+        if name not in self.image_aliases:
+            with open(name, 'rb') as f:
+                digest = hashlib.sha1(f.read()).hexdigest()
+            self.image_aliases[name] = self.image_digests.setdefault(digest, name)
+        return super().image(self.image_aliases[name], *args, **kwargs)
     def header(self):
         # Set font
         self.set_font('Helvetica', 'B', 12)
@@ -410,208 +666,107 @@ class PDF(FPDF):
         self.set_draw_color(0, 0, 0)  # Border color (black)
         self.rect(5, 5, self.w - 10, self.h - 10)  # Draw rectangle border
 
-# Function to style graphs using Seaborn
-def style_graphs():
-    sns.set_theme(style="whitegrid")
-    sns.set_palette("deep")
-    plt.rcParams.update({
-        'font.size': 10,
-        'axes.labelsize': 10,
-        'axes.titlesize': 12,
-        'xtick.labelsize': 8,
-        'ytick.labelsize': 8,
-        'font.family': 'sans-serif',
-        'font.sans-serif': ['Helvetica']
+# Function to pick a round tick step (1, 2 or 5 times a power of ten) for a chart axis
+def nice_tick_step(raw_step):
+    """Return the smallest round step that is at least raw_step."""
+    magnitude = 10 ** math.floor(math.log10(raw_step))
+    for multiple in (1, 2, 5, 10):
+        if multiple * magnitude >= raw_step:
+            return multiple * magnitude
+
+# Function to draw a bar chart with FPDF vector primitives (no raster image needed)
+def draw_bar_chart(pdf, data, title, color, y_label, x=15, y=20, w=180, h=135):
+    """Draw data (a Series indexed by year) as vertical bars in the w x h mm box at (x, y)."""
+    # Plot area inside the box, leaving room for the title, axis labels and tick labels
+    left = x + 15
+    right = x + w - 5
+    top = y + 18
+    bottom = y + h - 15
+    plot_width = right - left
+    plot_height = bottom - top
+
+    # Title
+    pdf.set_font('Helvetica', 'B', 12)
+    pdf.set_xy(x, y)
+    pdf.cell(w, 8, title, align='C')
+    if data.empty:
+        return
+
+    # Horizontal grid lines and y-axis tick labels
+    max_value = max(int(data.max()), 1)
+    # Counts are whole numbers, so never step by less than 1 (small libraries, or no page counts at all)
+    step = max(1, int(nice_tick_step(max_value / 5)))
+    y_max = math.ceil(max_value / step) * step
+    pdf.set_font('Helvetica', '', 7)
+    pdf.set_draw_color(220, 220, 220)
+    for tick in range(0, y_max + 1, step):
+        tick_y = bottom - plot_height * tick / y_max
+        pdf.line(left, tick_y, right, tick_y)
+        tick_label = f"{tick:,}"
+        pdf.text(left - 2 - pdf.get_string_width(tick_label), tick_y + 1, tick_label)
+
+    # Bars, labelling every nth year if the labels would otherwise overlap
+    slot = plot_width / len(data)
+    bar_width = slot * 0.8
+    pdf.set_font('Helvetica', '', 6)
+    label_every = math.ceil((pdf.get_string_width('0000') + 1) / slot)
+    pdf.set_fill_color(*color)
+    for i, (year, value) in enumerate(data.items()):
+        bar_x = left + i * slot + (slot - bar_width) / 2
+        bar_height = plot_height * value / y_max
+        if bar_height > 0:
+            pdf.rect(bar_x, bottom - bar_height, bar_width, bar_height, 'F')
+        if i % label_every == 0:
+            year_label = str(int(year))
+            pdf.text(bar_x + (bar_width - pdf.get_string_width(year_label)) / 2, bottom + 4, year_label)
+
+    # Axes
+    pdf.set_draw_color(0, 0, 0)
+    pdf.line(left, top, left, bottom)
+    pdf.line(left, bottom, right, bottom)
+
+    # Axis labels
+    pdf.set_font('Helvetica', '', 9)
+    pdf.text(left + (plot_width - pdf.get_string_width('Year')) / 2, bottom + 10, 'Year')
+    pdf.text(left, top - 4, y_label)
+
+# Function to load the Goodreads export and derive the columns the report uses
+def load_library(csv_path):
+    """Read the export CSV and return the books read (or published) since 2000."""
+    df = pd.read_csv(csv_path, engine='pyarrow')
+
+    # Parse 'Date Read' and the publication years once, coercing invalid values to missing
+    date_read = pd.to_datetime(df['Date Read'], errors='coerce')
+    year_published = pd.to_numeric(df['Year Published'], errors='coerce')
+    original_publication_year = pd.to_numeric(df['Original Publication Year'], errors='coerce')
+
+    # Clean every ISBN at once (same result as clean_isbn, with None for missing or empty ISBNs)
+    isbn_clean = df['ISBN13'].astype('string').str.replace(_ISBN_RE, '', regex=True).str.strip()
+
+    df = df.assign(**{
+        'Date Read': date_read,
+        'Year Read': date_read.dt.year,
+        'Year Published': year_published,
+        'Original Publication Year': original_publication_year,
+        # Latest year between 'Year Published' and 'Original Publication Year' (fmax ignores missing values)
+        'Latest Publication Year': np.fmax(year_published, original_publication_year),
+        # Ensure 'Number of Pages' is an integer
+        'Number of Pages': df['Number of Pages'].fillna(0).astype(int),
+        'ISBN_clean': isbn_clean.astype(object).where(isbn_clean.fillna('') != '', None),
     })
 
-# Load and preprocess data
-df = pd.read_csv('goodreads_library_export.csv')
-
-# Parse 'Date Read' with error handling
-df['Date Read'] = pd.to_datetime(df['Date Read'], errors='coerce')
-
-# Create 'Year Read' from 'Date Read'
-df['Year Read'] = df['Date Read'].dt.year
-
-# Handle invalid or missing 'Date Read' by using 'Year Published'
-df['Year Published'] = pd.to_numeric(df['Original Publication Year'], errors='coerce').fillna(0).astype(int)
-df['Year Published'] = df['Year Published'].replace(0, pd.NA)  # Replace 0 with NaN if no year is available
-
-# Create 'Year Categorized' column
-df['Year Categorized'] = df['Year Read'].fillna(df['Year Published'])
-
-# Drop rows where 'Year Categorized' is missing
-df = df.dropna(subset=['Year Categorized'])
-
-# Convert 'Year Categorized' to integer
-df['Year Categorized'] = df['Year Categorized'].astype(int)
-
-# Ensure 'Number of Pages' is an integer
-df['Number of Pages'] = df['Number of Pages'].fillna(0).astype(int)
-
-
-
-
-
-
-
-
-
-
-
-
-
-
+    # Handle invalid or missing 'Date Read' by using 'Latest Publication Year', dropping rows with neither
+    year_categorized = df['Year Read'].fillna(df['Latest Publication Year']).dropna().astype(int)
+    df = df.loc[year_categorized.index].assign(**{'Year Categorized': year_categorized})
 
+    # **Filter out books published before the year 2000**
+    # ('Year Categorized' has only a handful of distinct values, so store it as a category for faster grouping)
+    df = df[df['Year Categorized'] >= 2000].astype({'Year Categorized': 'category'})
 
+    return df
 
-
-
-
-
-
-# Subclass FPDF to add headers, footers, and page borders
-class PDF(FPDF):
-    def header(self):
-        # Set font
-        self.set_font('Helvetica', 'B', 12)
-        # Title
-        self.cell(0, 10, 'Goodreads Reading Report', ln=True, align='C')
-        self.ln(5)
-    def footer(self):
-        # Position at 1.5 cm from bottom
-        self.set_y(-15)
-        # Set font
-        self.set_font('Helvetica', 'I', 8)
-        # Page number
-        self.cell(0, 10, f'Page {self.page_no()}', align='C')
-    def add_page(self, *args, **kwargs):
-        super().add_page(*args, **kwargs)
-        # Add page border
-        self.set_draw_color(0, 0, 0)  # Border color (black)
-        self.rect(5, 5, self.w - 10, self.h - 10)  # Draw rectangle border
-
-# Function to style graphs using Seaborn
-def style_graphs():
-    sns.set_theme(style="whitegrid")
-    sns.set_palette("deep")
-    plt.rcParams.update({
-        'font.size': 10,
-        'axes.labelsize': 10,
-        'axes.titlesize': 12,
-        'xtick.labelsize': 8,
-        'ytick.labelsize': 8,
-        'font.family': 'sans-serif',
-        'font.sans-serif': ['Helvetica']
-    })
-
-# Load and preprocess data
-df = pd.read_csv('goodreads_library_export.csv')
-
-# Parse 'Date Read' with error handling
-df['Date Read'] = pd.to_datetime(df['Date Read'], errors='coerce')
-
-# Create 'Year Read' from 'Date Read'
-df['Year Read'] = df['Date Read'].dt.year
-
-# Convert 'Year Published' and 'Original Publication Year' to numeric, handling errors and missing values
-df['Year Published'] = pd.to_numeric(df['Year Published'], errors='coerce')
-df['Original Publication Year'] = pd.to_numeric(df['Original Publication Year'], errors='coerce')
-
-# Calculate the latest year between 'Year Published' and 'Original Publication Year'
-df['Latest Publication Year'] = df[['Year Published', 'Original Publication Year']].max(axis=1)
-
-# Handle invalid or missing 'Date Read' by using 'Latest Publication Year'
-df['Year Categorized'] = df['Year Read'].fillna(df['Latest Publication Year'])
-
-# Drop rows where 'Year Categorized' is missing
-df = df.dropna(subset=['Year Categorized'])
-
-# Convert 'Year Categorized' to integer
-df['Year Categorized'] = df['Year Categorized'].astype(int)
-
-# **Filter out books published before the year 2000**
-df = df[df['Year Categorized'] >= 2000]
-
-# Ensure 'Number of Pages' is an integer
-df['Number of Pages'] = df['Number of Pages'].fillna(0).astype(int)
-
-# Initialize PDF
-pdf = PDF()
-pdf.set_auto_page_break(auto=True, margin=15)
-
-# Title page
-pdf.add_page()
-pdf.set_font('Helvetica', 'B', 20)
-pdf.cell(0, 80, txt="Goodreads Reading Report", ln=True, align='C')
-pdf.set_font('Helvetica', '', 14)
-pdf.cell(0, 10, txt="An overview of your reading activity", ln=True, align='C')
-
-# Style and generate graphs
-style_graphs()
-
-# Plot "Books per Year"
-plt.figure(figsize=(8, 6))
-books_per_year = df.groupby('Year Categorized').size()
-sns.barplot(x=books_per_year.index.astype(int), y=books_per_year.values, color='#0072C6')
-plt.title('Books per Year')
-plt.xlabel('Year')
-plt.ylabel('Number of Books')
-plt.tight_layout()
-plt.savefig('books_per_year.png', dpi=300)
-plt.close()
-
-# Plot "Pages per Year"
-plt.figure(figsize=(8, 6))
-pages_per_year = df.groupby('Year Categorized')['Number of Pages'].sum()
-sns.barplot(x=pages_per_year.index.astype(int), y=pages_per_year.values, color='#FF9900')
-plt.title('Pages per Year')
-plt.xlabel('Year')
-plt.ylabel('Total Pages Read')
-plt.tight_layout()
-plt.savefig('pages_per_year.png', dpi=300)
-plt.close()
-
-# Add graphs to PDF
-pdf.add_page()
-pdf.image('books_per_year.png', x=15, y=20, w=180)
-pdf.add_page()
-pdf.image('pages_per_year.png', x=15, y=20, w=180)
-
-# Summary Table
-pdf.add_page()
-pdf.set_font('Helvetica', 'B', 14)
-pdf.cell(0, 10, txt="Reading Summary per Year", ln=True, align='C')
-pdf.ln(5)
-
-# Create a DataFrame for summary
-summary_df = pd.DataFrame({
-    'Books': books_per_year,
-    'Pages': pages_per_year
-}).reset_index().rename(columns={'Year Categorized': 'Year'})
-summary_df['Year'] = summary_df['Year'].astype(int)
-
-# Add summary table
-pdf.set_font('Helvetica', '', 12)
-col_widths = [30, 50, 50]
-pdf.set_fill_color(200, 200, 200)
-pdf.cell(col_widths[0], 10, 'Year', border=1, fill=True, align='C')
-pdf.cell(col_widths[1], 10, 'Books Read', border=1, fill=True, align='C')
-pdf.cell(col_widths[2], 10, 'Pages Read', border=1, fill=True, align='C')
-pdf.ln()
-for index, row in summary_df.iterrows():
-    pdf.cell(col_widths[0], 10, str(row['Year']), border=1, align='C')
-    pdf.cell(col_widths[1], 10, str(row['Books']), border=1, align='C')
-    pdf.cell(col_widths[2], 10, str(row['Pages']), border=1, align='C')
-    pdf.ln()
-
-# Add book cards organized by 'Year Categorized'
-pdf.set_font('Helvetica', 'B', 14)
-pdf.add_page()
-pdf.cell(0, 10, txt="Books by Year", ln=True, align='C')
-pdf.ln(5)
-
-def add_book_cards(pdf, df, year):
+# Function to lay out the book cards for one year
+def add_book_cards(pdf, df, year, cover_paths, cover_sizes):
     # Adjusted card size (reduced to 50% of original size)
     original_card_width = 60
     original_card_height = 90
@@ -642,23 +797,36 @@ def add_book_cards(pdf, df, year):
 
     row_height = card_height + 18  # Adjusted for text area
 
-    for index, row in df.iterrows():
-        title = row['Title']
-        author = row['Author']
-        pages = row['Number of Pages']
-        date_read = row['Date Read']
-        latest_pub_year = row['Latest Publication Year']
+    # Only the columns the cards use, renamed so itertuples exposes them as attributes
+    cards = df[['Book Id', 'Title', 'Author', 'Number of Pages', 'Date Read', 'Latest Publication Year']].rename(columns={
+        'Book Id': 'BookId',
+        'Number of Pages': 'Pages',
+        'Date Read': 'DateRead',
+        'Latest Publication Year': 'LatestPubYear',
+    })
+
+    for row in cards.itertuples(index=False):
+        title = row.Title
+        author = row.Author
+        pages = row.Pages
+        date_read = row.DateRead
+        latest_pub_year = row.LatestPubYear
 
         if pd.notna(date_read):
             date_info = f"Read: {date_read.date()}"
         else:
             date_info = f"Latest Pub: {int(latest_pub_year)}"
 
-        cover_path = download_cover(row)
+        cover_path = cover_paths.get(row.BookId)
 
         # Draw the book card
-        if cover_path and os.path.exists(cover_path):
-            pdf.image(cover_path, x=x, y=y, w=card_width, h=card_height)
+        if cover_path in cover_sizes:
+            # Fit the cover inside the card, keeping its aspect ratio, and center it
+            img_width, img_height = cover_sizes[cover_path]
+            scale = min(card_width / img_width, card_height / img_height)
+            w = img_width * scale
+            h = img_height * scale
+            pdf.image(cover_path, x=x + (card_width - w) / 2, y=y + (card_height - h) / 2, w=w, h=h)
         else:
             pdf.rect(x, y, card_width, card_height)
 
@@ -706,21 +874,92 @@ def add_book_cards(pdf, df, year):
     # Reset position
     pdf.set_xy(x_start, y + row_height)
 
-# Group books by 'Year Categorized' and add them to the PDF
-for year in sorted(df['Year Categorized'].unique(), reverse=True):
-    year_df = df[df['Year Categorized'] == year]
+# Build the report: fetch covers, render the PDF and write the missing covers report
+def main():
+    # Ensure directories exist
+    if not os.path.exists(cover_dir):
+        os.makedirs(cover_dir)
+
+    # Load and preprocess data
+    df = load_library('goodreads_library_export.csv')
+
+    # Initialize PDF
+    pdf = PDF()
+    pdf.set_auto_page_break(auto=True, margin=15)
+
+    # Title page
     pdf.add_page()
-    pdf.set_font('Helvetica', 'B', 16)
-    pdf.cell(0, 10, txt=f"Books in {int(year)}", ln=True, align='C')
+    pdf.set_font('Helvetica', 'B', 20)
+    pdf.cell(0, 80, txt="Goodreads Reading Report", ln=True, align='C')
+    pdf.set_font('Helvetica', '', 14)
+    pdf.cell(0, 10, txt="An overview of your reading activity", ln=True, align='C')
+
+    # Count books and total pages per year in a single groupby pass
+    per_year = df.groupby('Year Categorized', sort=True, observed=True).agg(
+        Books=('Title', 'size'),
+        Pages=('Number of Pages', 'sum'),
+    )
+    books_per_year = per_year['Books']
+    pages_per_year = per_year['Pages']
+
+    # Add graphs to PDF
+    pdf.add_page()
+    draw_bar_chart(pdf, books_per_year, 'Books per Year', (0, 114, 198), 'Number of Books')
+    pdf.add_page()
+    draw_bar_chart(pdf, pages_per_year, 'Pages per Year', (255, 153, 0), 'Total Pages Read')
+
+    # Summary Table
+    pdf.add_page()
+    pdf.set_font('Helvetica', 'B', 14)
+    pdf.cell(0, 10, txt="Reading Summary per Year", ln=True, align='C')
     pdf.ln(5)
-    add_book_cards(pdf, year_df, year)
 
-# Output the PDF
-pdf.output('goodreads_professional_report.pdf')
+    # Create a DataFrame for summary
+    summary_df = per_year.reset_index().rename(columns={'Year Categorized': 'Year'})
+    summary_df['Year'] = summary_df['Year'].astype(int)
+
+    # Add summary table
+    pdf.set_font('Helvetica', '', 12)
+    col_widths = [30, 50, 50]
+    pdf.set_fill_color(200, 200, 200)
+    pdf.cell(col_widths[0], 10, 'Year', border=1, fill=True, align='C')
+    pdf.cell(col_widths[1], 10, 'Books Read', border=1, fill=True, align='C')
+    pdf.cell(col_widths[2], 10, 'Pages Read', border=1, fill=True, align='C')
+    pdf.ln()
+    years = summary_df['Year'].to_numpy()
+    books = summary_df['Books'].to_numpy()
+    pages = summary_df['Pages'].to_numpy()
+    for year, year_books, year_pages in zip(years, books, pages):
+        pdf.cell(col_widths[0], 10, str(year), border=1, align='C')
+        pdf.cell(col_widths[1], 10, str(year_books), border=1, align='C')
+        pdf.cell(col_widths[2], 10, str(year_pages), border=1, align='C')
+        pdf.ln()
+
+    # Add book cards organized by 'Year Categorized'
+    pdf.set_font('Helvetica', 'B', 14)
+    pdf.add_page()
+    pdf.cell(0, 10, txt="Books by Year", ln=True, align='C')
+    pdf.ln(5)
+
+    # Fetch every cover concurrently before laying out the cards
+    cover_paths, missing_books = fetch_covers(df)
+    cover_sizes = read_cover_sizes(cover_paths)
+
+    # Group books by 'Year Categorized' and add them to the PDF
+    for year in sorted(df['Year Categorized'].unique(), reverse=True):
+        year_df = df[df['Year Categorized'] == year]
+        pdf.add_page()
+        pdf.set_font('Helvetica', 'B', 16)
+        pdf.cell(0, 10, txt=f"Books in {int(year)}", ln=True, align='C')
+        pdf.ln(5)
+        add_book_cards(pdf, year_df, year, cover_paths, cover_sizes)
+
+    # Output the PDF
+    pdf.output(name='goodreads_professional_report.pdf', dest='F')
+
+    # Generate missing books report
+    generate_missing_books_report(missing_books)
 
-# Clean up chart images
-os.remove('books_per_year.png')
-os.remove('pages_per_year.png')
 
-# Generate missing books report
-generate_missing_books_report(missing_books)
\ No newline at end of file
+if __name__ == '__main__':
+    main()